@@ -6,7 +6,7 @@ import click
 
 from . import bibliography as bib
 from .util import Bijection, dedup_key
-from .paperpile import find_pp_bib
+from .paperpile import PP_ATTR, find_pp_bib, assign_reduced_keys, extract_pp_keymap
 
 
 @click.group()
@@ -14,6 +14,17 @@ def cli():
 	pass
 
 
+def write_bibliography_atomic(path, db):
+	"""Write bibliography to a temporary file, then atomically replace the target.
+
+	A crash mid-write can't leave a half-written file behind, and no second
+	copy of the file contents is held in memory.
+	"""
+	tmp = str(path) + '.tmp'
+	bib.write_bibliography(tmp, db)
+	os.replace(tmp, path)
+
+
 def resolve_conflicts_interactively(keys, keymap, updates, conflicts):
 	raise NotImplementedError()
 
@@ -117,15 +128,13 @@ def assignkeys(bibfile,
 		click.echo('Using most recent Paperpile export in directory: %s' % bibfile, err=True)
 
 	# Read source bibliography
-	with open(bibfile) as f:
-		db = bib.read_bibliography(f, check=True)
+	db = bib.read_bibliography_cached(bibfile, check=True)
 
 	# Merging into existing?
 	if merge_into is not None:
-		with open(merge_into) as f:
-			target_db = bib.read_bibliography(f, check=True)
-		keymap = bib.keymap_from_bibliography(target_db)
-		db = bib.merge_dbs(bib.revert_keys(target_db), db)
+		target_db = bib.read_bibliography_cached(merge_into, check=True)
+		keymap = extract_pp_keymap(target_db)
+		db = bib.merge_dbs(bib.revert_keys(target_db, PP_ATTR), db)
 
 	else:
 		keymap = Bijection()
@@ -137,10 +146,12 @@ def assignkeys(bibfile,
 
 	# Auto-assign
 	if auto_assign:
-		updates, conflicts = bib.assign_reduced_keys(db.entries_dict, keymap=keymap)
+		# BibDatabase.entries_dict rebuilds the whole dict per access and we
+		# only need the keys, so pull them from the entry list directly
+		keys = [entry['ID'] for entry in db.entries]
+		updates, conflicts = assign_reduced_keys(keys, keymap=keymap)
 
 		if conflicts:
-			keys = list(db.entries_dict)
 			if interactive:
 				resolve_conflicts_interactively(keys, keymap, updates, conflicts)
 			if auto_resolve:
@@ -164,13 +175,11 @@ def assignkeys(bibfile,
 
 	# Update original bibliography file
 	if update:
-		with open(bibfile, 'w') as f:
-			bib.write_bibliography(f, dbout)
+		write_bibliography_atomic(bibfile, dbout)
 
 	# Merge into existing
 	if merge_into is not None:
-		with open(merge_into, 'w') as f:
-			bib.write_bibliography(f, dbout)
+		write_bibliography_atomic(merge_into, dbout)
 
 	# Write keymap
 	if write_keymap is not None:
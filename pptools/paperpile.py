@@ -1,17 +1,22 @@
 """PaperPile-specific code."""
 
+import os
 import re
+import sys
+import fnmatch
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from bibtexparser.bibdatabase import BibDatabase
 
-from .util import BijectionKeyConflict, KeyLoc, str_replace_map, FilePath
+from .util import Bijection, BijectionKeyConflict, KeyLoc, str_replace_map, FilePath
 from .bibliography import extract_keymap, KeyMap
 
 
-__all__ = ['PP_ATTR', 'remove_pp_suffix', 'extract_pp_keymap', 'find_pp_bib_all',
-           'find_pp_bib', 'normalize_pp_key']
+__all__ = ['PP_ATTR', 'remove_pp_suffix', 'assign_reduced_keys', 'extract_pp_keymap',
+           'find_pp_bib_all', 'find_pp_bib', 'normalize_pp_key']
 
 
 #: Attribute to store original PaperPile key in
@@ -25,19 +30,77 @@ KEY_NORM_MAP = {
 	r'{(\w+)}': '\\1',  # Weird brackets around words
 }
 
+#: KEY_NORM_MAP with the patterns compiled once at import
+_KEY_NORM_COMPILED = {re.compile(pattern): repl for pattern, repl in KEY_NORM_MAP.items()}
+
 
 def normalize_pp_key(key: str) -> str:
 	"""Normalize a paperpile key."""
-	return str_replace_map(KEY_NORM_MAP, key, regex=True)
+	return str_replace_map(_KEY_NORM_COMPILED, key, regex=True)
 
 
+@lru_cache(maxsize=None)
 def remove_pp_suffix(key: str) -> str:
 	"""Remove extra characters Paperpile appends to a Bibtex key."""
-	if re.fullmatch(r'.*?-[A-Za-z]{2}$', key):
-		return key[:-3]
+	# Suffix is a dash followed by two ASCII letters
+	if len(key) >= 3 and key[-3] == '-':
+		tail = key[-2:]
+		if tail.isascii() and tail.isalpha():
+			return key[:-3]
 	return key
 
 
+def assign_reduced_keys(keys: Iterable[str], keymap: Optional[KeyMap] = None) -> Tuple[KeyMap, Dict[str, List[str]]]:
+	"""Assign suffix-stripped replacements for Paperpile keys, detecting conflicts.
+
+	Parameters
+	----------
+	keys
+		Existing Paperpile keys.
+	keymap
+		Existing key assignments. Keys already present on the left side are skipped.
+
+	Returns
+	-------
+	tuple
+		Tuple of ``(updates, conflicts)`` as in
+		:func:`pptools.bibliography.make_keymap`.
+	"""
+	keys = list(keys)
+	assigned = keymap.left if keymap is not None else ()
+
+	revmap = defaultdict(list)
+	for key in keys:
+		if key in assigned:
+			continue
+		# Inline the remove_pp_suffix check so keys without the suffix skip the
+		# slice allocation entirely
+		if len(key) < 3 or key[-3] != '-' or not (key[-2:].isascii() and key[-2:].isalpha()):
+			continue
+		revmap[sys.intern(key[:-3])].append(key)
+
+	# Reduced keys may also collide with keys that are staying as they are, or
+	# with replacements already present in the keymap
+	reducing = {key for oldkeys in revmap.values() for key in oldkeys}
+	taken = set(keymap.right) if keymap is not None else set()
+	taken.update(key for key in keys if key not in reducing)
+
+	updates = Bijection()
+	conflicts = {}
+	pairs = []
+
+	for newkey, oldkeys in revmap.items():
+		if len(oldkeys) == 1 and newkey not in taken:
+			pairs.append((oldkeys[0], newkey))
+		else:
+			conflicts[newkey] = oldkeys
+
+	# Each old and new key appears exactly once, so skip the conflict checks
+	updates._bulk_add_unchecked(pairs)
+
+	return updates, conflicts
+
+
 def extract_pp_keymap(db: BibDatabase) -> KeyMap:
 	try:
 		return extract_keymap(db, PP_ATTR)
@@ -58,12 +121,21 @@ def extract_pp_keymap(db: BibDatabase) -> KeyMap:
 			assert 0
 
 
+#: File name pattern of Paperpile export files
+PP_BIB_PATTERN = 'Paperpile - * BibTeX Export*.bib'
+
+#: PP_BIB_PATTERN compiled to a regex, avoiding per-name fnmatch overhead
+_PP_BIB_RE = re.compile(fnmatch.translate(PP_BIB_PATTERN))
+
+
 def find_pp_bib_all(directory: FilePath) -> List[Path]:
 	"""Find all Paperpile export files in directory by file name."""
-	return list(Path(directory).glob('Paperpile - * BibTeX Export*.bib'))
+	with os.scandir(directory) as entries:
+		return [Path(entry.path) for entry in entries
+		        if entry.is_file() and _PP_BIB_RE.match(entry.name)]
 
 
-def find_pp_bib(directory: FilePath) -> Path:
+def find_pp_bib(directory: FilePath) -> Optional[Path]:
 	"""Find most recent PaperPile export file in directory by name.
 
 	Note - this works of the creation time in the file's metadata, not by parsing
@@ -72,10 +144,15 @@ def find_pp_bib(directory: FilePath) -> Path:
 	mostrecent = None
 	mostrecent_time = 0
 
-	for file in find_pp_bib_all(directory):
-		ctime = file.stat().st_ctime
-		if ctime > mostrecent_time:
-			mostrecent = file
-			mostrecent_time = ctime
-
-	return mostrecent
+	# Single scandir pass - DirEntry.stat() reuses the stat result from the
+	# directory scan instead of making a second syscall per file.
+	with os.scandir(directory) as entries:
+		for entry in entries:
+			if not entry.is_file() or not _PP_BIB_RE.match(entry.name):
+				continue
+			ctime = entry.stat().st_ctime
+			if ctime > mostrecent_time:
+				mostrecent = entry.path
+				mostrecent_time = ctime
+
+	return None if mostrecent is None else Path(mostrecent)
@@ -1,5 +1,5 @@
 from typing import MutableMapping, MutableSet, Tuple, Any, Optional, Iterable, Mapping, Union, Dict, \
-	Collection, TypeVar
+	TypeVar
 from enum import IntEnum
 
 
@@ -9,6 +9,9 @@ __all__ = ['KeyLoc', 'BijectionKeyConflict', 'Bijection', 'get_bijection']
 L = TypeVar('L')
 R = TypeVar('R')
 
+#: Sentinel for missing values in dict lookups
+_SENTINEL = object()
+
 
 class KeyLoc(IntEnum):
 	"""Location of a key in a Bijection key pair.
@@ -35,18 +38,29 @@ class KeyLoc(IntEnum):
 
 	def toabs(self, fromside):
 		self._checkabs(fromside)
-		if not self.relative:
-			return self
-		return KeyLoc((self & 1) ^ fromside)
+		return KeyLoc._TOABS[self][fromside]
 
 	def torel(self, fromside):
 		self._checkabs(fromside)
-		if self.relative:
-			return self
-		return KeyLoc((self ^ fromside) | 2)
+		return KeyLoc._TOREL[self][fromside]
 
 	def flip(self):
-		return KeyLoc(self ^ 1)
+		return KeyLoc._FLIP[self]
+
+
+# Precomputed conversion tables - going through the Enum constructor per call
+# is slow enough to matter on the conflict-translation paths.
+KeyLoc._TOABS = {
+	side: {fromside: KeyLoc((side & 1) ^ fromside) if side.relative else side
+	       for fromside in (KeyLoc.LEFT, KeyLoc.RIGHT)}
+	for side in KeyLoc
+}
+KeyLoc._TOREL = {
+	side: {fromside: side if side.relative else KeyLoc((side ^ fromside) | 2)
+	       for fromside in (KeyLoc.LEFT, KeyLoc.RIGHT)}
+	for side in KeyLoc
+}
+KeyLoc._FLIP = {side: KeyLoc(side ^ 1) for side in KeyLoc}
 
 
 class BijectionKeyConflict(KeyError):
@@ -63,6 +77,8 @@ class BijectionKeyConflict(KeyError):
 	current
 		Existing key value that caused the conflict.
 	"""
+	__slots__ = ('keypair', 'side', 'current')
+
 	keypair: Tuple[Any, Any]
 	side: KeyLoc
 	current: Any
@@ -99,6 +115,8 @@ class BijectionMap(MutableMapping[L, R]):
 	other
 		The reverse mapping
 	"""
+	__slots__ = ('other', 'dict')
+
 	other: 'BijectionMap[R, L]'
 	dict: Dict[L, R]
 
@@ -115,24 +133,68 @@ class BijectionMap(MutableMapping[L, R]):
 	def __contains__(self, value):
 		return value in self.dict
 
+	# Delegate directly to the backing dict, bypassing the Mapping mixin
+	# implementations which route through Python-level __getitem__.
+
+	def keys(self):
+		return self.dict.keys()
+
+	def values(self):
+		return self.dict.values()
+
+	def items(self):
+		return self.dict.items()
+
+	def get(self, key, default=None):
+		return self.dict.get(key, default)
+
+	def update(self, other=()):
+		if isinstance(other, BijectionMap):
+			other = other.dict
+		items = other.items() if isinstance(other, Mapping) else other
+		for key, value in items:
+			self[key] = value
+
+	def _bulk_load(self, mapping: Mapping):
+		"""Load a mapping into an empty map without per-pair conflict checks.
+
+		Verifies consistency once at the end and falls back to the checked
+		insert path (raising the appropriate conflict) only on failure.
+		"""
+		d = self.dict
+		other_dict = self.other.dict
+		for key, value in mapping.items():
+			d[key] = value
+			other_dict[value] = key
+
+		if len(d) != len(other_dict):
+			# Not a bijection - redo with per-pair checks to raise the right error
+			d.clear()
+			other_dict.clear()
+			self.update(mapping)
+
 	def __getitem__(self, key):
 		return self.dict[key]
 
 	def __setitem__(self, key, value):
-		if key in self.dict:
-			value2 = self.dict[key]
+		d = self.dict
+		other_dict = self.other.dict
+
+		# Single probe per dict via get with a sentinel
+		value2 = d.get(key, _SENTINEL)
+		if value2 is not _SENTINEL:
 			if value2 != value:
 				raise BijectionKeyConflict((key, value), KeyLoc.TO, value2)
 			return
 
-		if value in self.other.dict:
-			key2 = self.other.dict[value]
+		key2 = other_dict.get(value, _SENTINEL)
+		if key2 is not _SENTINEL:
 			if key2 != key:
 				raise BijectionKeyConflict((key, value), KeyLoc.FROM, key2)
 			return
 
-		self.dict[key] = value
-		self.other.dict[value] = key
+		d[key] = value
+		other_dict[value] = key
 
 	def __delitem__(self, key):
 		value = self.dict.pop(key)
@@ -157,6 +219,8 @@ class Bijection(MutableSet[Tuple[L, R]]):
 	right
 		Collection of right keys (read-only).
 	"""
+	__slots__ = ('ltr', 'rtl', 'left', 'right')
+
 	ltr: BijectionMap[L, R]
 	rtl: BijectionMap[R, L]
 
@@ -175,7 +239,7 @@ class Bijection(MutableSet[Tuple[L, R]]):
 		self.right = self.rtl.keys()
 
 		if isinstance(pairs, Bijection):
-			self.ltr.update(pairs.ltr)
+			self.ltr._bulk_load(pairs.ltr.dict)
 
 		elif pairs is not None:
 			for left, right in pairs:
@@ -185,14 +249,44 @@ class Bijection(MutableSet[Tuple[L, R]]):
 	def from_ltr(mapping: Mapping[L, R]) -> 'Bijection[L, R]':
 		"""Create new bijection from left-to-right mapping."""
 		b = Bijection()
-		b.ltr.update(mapping)
+		b.ltr._bulk_load(mapping)
 		return b
 
 	@staticmethod
 	def from_rtl(mapping: Mapping[R, L]) -> 'Bijection[L, R]':
 		"""Create new bijection from right-to-left mapping."""
 		b = Bijection()
-		b.rtl.update(mapping)
+		b.rtl._bulk_load(mapping)
+		return b
+
+	@classmethod
+	def _unchecked_from_ltr(cls, mapping: Mapping[L, R]) -> 'Bijection[L, R]':
+		"""Create bijection from a left-to-right mapping whose values are known unique.
+
+		Skips all conflict checks, including the end-of-load verification done
+		by :meth:`from_ltr`.
+		"""
+		b = cls()
+		ltr = b.ltr.dict
+		rtl = b.rtl.dict
+		ltr.update(mapping)
+		for left, right in ltr.items():
+			rtl[right] = left
+		return b
+
+	@classmethod
+	def _unchecked_from_rtl(cls, mapping: Mapping[R, L]) -> 'Bijection[L, R]':
+		"""Create bijection from a right-to-left mapping whose values are known unique.
+
+		Skips all conflict checks, including the end-of-load verification done
+		by :meth:`from_rtl`.
+		"""
+		b = cls()
+		ltr = b.ltr.dict
+		rtl = b.rtl.dict
+		rtl.update(mapping)
+		for right, left in rtl.items():
+			ltr[left] = right
 		return b
 
 	@staticmethod
@@ -219,6 +313,14 @@ class Bijection(MutableSet[Tuple[L, R]]):
 		except BijectionKeyConflict as e:
 			raise e.toabs(KeyLoc.LEFT) from e
 
+	def _bulk_add_unchecked(self, pairs: Iterable[Tuple[L, R]]):
+		"""Add pairs known to be unique on both sides, skipping conflict checks."""
+		ltr = self.ltr.dict
+		rtl = self.rtl.dict
+		for left, right in pairs:
+			ltr[left] = right
+			rtl[right] = left
+
 	def discard(self, pair: Tuple[L, R]):
 		if pair not in self:
 			raise KeyError(pair)
@@ -244,32 +346,41 @@ class Bijection(MutableSet[Tuple[L, R]]):
 			raise e.toabs(KeyLoc.RIGHT) from e
 
 	def _update(self, self_map, other_map):
-		for key in other_map:
-			try:
-				del self_map[key]
-			except KeyError:
-				continue
+		# C-level key intersection yields only the keys actually present,
+		# avoiding a try/except per key. The list() guards against mutating
+		# the view while iterating.
+		for key in list(self_map.keys() & other_map.keys()):
+			del self_map[key]
 
 		self_map.update(other_map)
 
 	def conflicts(self, other: 'Bijection') -> Tuple[Dict, Dict]:
 		"""Find key conflicts with another bijection."""
-		ltr = {}
-		rtl = {}
-
-		for left in self.left & other.left:
-			v1 = self.ltr[left]
-			v2 = other.ltr[left]
-			if v1 != v2:
-				ltr[left] = v1, v2
+		ltr = self._map_conflicts(self.ltr.dict, other.ltr.dict)
+		rtl = self._map_conflicts(self.rtl.dict, other.rtl.dict)
+		return ltr, rtl
 
-		for right in self.right & other.right:
-			v1 = self.rtl[right]
-			v2 = other.ltr[right]
-			if v1 != v2:
-				rtl[right] = v1, v2
+	@staticmethod
+	def _map_conflicts(self_dict: Dict, other_dict: Dict) -> Dict:
+		"""Find keys mapped to different values by two dicts.
 
-		return ltr, rtl
+		Iterates the smaller dict and probes the larger, so no intermediate
+		key set is materialized.
+		"""
+		out = {}
+
+		if len(self_dict) <= len(other_dict):
+			for key, v1 in self_dict.items():
+				v2 = other_dict.get(key, _SENTINEL)
+				if v2 is not _SENTINEL and v1 != v2:
+					out[key] = v1, v2
+		else:
+			for key, v2 in other_dict.items():
+				v1 = self_dict.get(key, _SENTINEL)
+				if v1 is not _SENTINEL and v1 != v2:
+					out[key] = v1, v2
+
+		return out
 
 
 def get_bijection(arg: Union[Bijection, Mapping], dir: str = 'ltr') -> Bijection:
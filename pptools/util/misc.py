@@ -1,24 +1,38 @@
-from typing import MutableMapping, MutableSet, Tuple, Any, Optional, Iterable, Mapping, Union, Dict,\
-	Collection, TypeVar, IO, ContextManager
-from enum import IntEnum
+from typing import Tuple, Iterable, Mapping, Union, Collection, IO, ContextManager
 import os
-import string
 import itertools
 from contextlib import nullcontext
+from functools import lru_cache
 import re
 
 FilePath = Union[str, os.PathLike]
 
 
 
+def _to_letters(n: int) -> str:
+	"""Get the nth (1-based) non-empty string of lower case letters, in shortest-first order.
+
+	Bijective base-26: ``1 -> 'a'``, ``26 -> 'z'``, ``27 -> 'aa'``, etc.
+	"""
+	chars = bytearray()
+	while n:
+		n, r = divmod(n - 1, 26)
+		chars.append(97 + r)  # ord('a') == 97
+	chars.reverse()
+	return chars.decode('ascii')
+
+
 def iter_letters() -> Iterable[str]:
 	"""Iterate over all non-empty strings of lower case letters, shortest first."""
-	i = 1
+	n = 1
 	while True:
-		sets = [string.ascii_lowercase] * i
-		for letters in itertools.product(*sets):
-			yield ''.join(letters)
-		i += 1
+		yield _to_letters(n)
+		n += 1
+
+
+#: Precomputed one- and two-letter suffixes - covers all but pathological
+#: :func:`dedup_key` calls without touching the generator machinery.
+_SUFFIXES = tuple(itertools.islice(iter_letters(), 26 + 26 ** 2))
 
 
 def dedup_key(key: str, existing: Collection[str], sep: str = '') -> str:
@@ -38,7 +52,8 @@ def dedup_key(key: str, existing: Collection[str], sep: str = '') -> str:
 	str
 		``key`` with suffix added such that it does not match any keys in ``existing``.
 	"""
-	for suffix in iter_letters():
+	suffixes = itertools.chain(_SUFFIXES, itertools.islice(iter_letters(), len(_SUFFIXES), None))
+	for suffix in suffixes:
 		# Special case - consider the first "a" suffix to be equal to original key
 		if suffix == 'a' and key in existing:
 			continue
@@ -47,13 +62,24 @@ def dedup_key(key: str, existing: Collection[str], sep: str = '') -> str:
 			return newkey
 
 
+@lru_cache(maxsize=None)
+def _compile_literal_alternation(literals: Tuple[str, ...]) -> 're.Pattern':
+	"""Compile a pattern matching any of the given literal substrings."""
+	return re.compile('|'.join(map(re.escape, literals)))
+
+
 def str_replace_map(d: Mapping[str, str], s: str, regex: bool = False) -> str:
 	"""Replace multiple substrings at once using a mapping.
 
+	Literal (non-regex) replacements are made in a single pass over the string
+	rather than one pass per pattern, so earlier replacements are not subject
+	to later ones.
+
 	Parameters
 	----------
 	d : mapping
-		Mapping from substrings to replacements
+		Mapping from substrings to replacements. If ``regex`` is True the keys
+		may also be pre-compiled patterns.
 	s : str
 		String to replace within
 
@@ -62,12 +88,19 @@ def str_replace_map(d: Mapping[str, str], s: str, regex: bool = False) -> str:
 	str
 		String with replacements made
 	"""
-	for (pattern, replacement) in d.items():
-		if regex:
-			s = re.sub(pattern, replacement, s)
-		else:
-			s = s.replace(pattern, replacement)
-	return s
+	if regex:
+		for (pattern, replacement) in d.items():
+			if isinstance(pattern, re.Pattern):
+				s = pattern.sub(replacement, s)
+			else:
+				s = re.sub(pattern, replacement, s)
+		return s
+
+	if not d:
+		return s
+
+	pattern = _compile_literal_alternation(tuple(d))
+	return pattern.sub(lambda m: d[m.group(0)], s)
 
 
 def maybe_open(file_or_path: Union[FilePath, IO], mode: str = 'r', **open_kw) -> ContextManager[IO]:
@@ -94,13 +127,11 @@ def maybe_open(file_or_path: Union[FilePath, IO], mode: str = 'r', **open_kw) ->
 		Context manager which gives an open file object on enter and closes it on exit only if it
 		was opened by this function.
 	"""
-	try:
-		# Try to interpret as path
-		path = os.fspath(file_or_path)
-	except TypeError:
-		# Not a path, assume file object
-		# Return context manager which gives this object on enter and does not close on exit
-		return nullcontext(file_or_path)
-	else:
-		# Is a path, just open
-		return open(path, mode, **open_kw)
+	# Same check os.fspath does internally, but without paying for the
+	# TypeError on the (common) file-object branch
+	if isinstance(file_or_path, (str, bytes, os.PathLike)):
+		return open(os.fspath(file_or_path), mode, **open_kw)
+
+	# Not a path, assume file object
+	# Return context manager which gives this object on enter and does not close on exit
+	return nullcontext(file_or_path)
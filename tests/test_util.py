@@ -1,6 +1,9 @@
+import itertools
+
 import pytest
 
 from pptools.util.bijection import Bijection, KeyLoc, BijectionKeyConflict
+from pptools.util.misc import iter_letters, dedup_key
 
 
 def test_KeyLoc():
@@ -80,3 +83,23 @@ def test_Bijection_add_conflict():
 	e = excinfo.value
 	assert isinstance(e, BijectionKeyConflict)
 	assert e.args == (pair, KeyLoc.LEFT, 1)
+
+
+def test_iter_letters():
+	letters = list(itertools.islice(iter_letters(), 55))
+
+	assert letters[:3] == ['a', 'b', 'c']
+	assert letters[25] == 'z'
+	assert letters[26] == 'aa'
+	assert letters[51] == 'az'
+	assert letters[52] == 'ba'
+
+
+def test_dedup_key():
+	assert dedup_key('k', set()) == 'ka'
+
+	# First "a" suffix is considered equal to the original key
+	assert dedup_key('k', {'k'}) == 'kb'
+	assert dedup_key('k', {'k', 'kb', 'kc'}) == 'kd'
+
+	assert dedup_key('k', {'k'}, sep='-') == 'k-b'